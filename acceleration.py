@@ -0,0 +1,22 @@
+"""
+Optional Numba acceleration for the numeric kernels.
+
+Numba is not a hard dependency: when it is missing, ``njit`` leaves the
+decorated function untouched and ``prange`` is the built-in ``range``, so
+every kernel still runs as plain Python/NumPy code.
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports @njit and @njit(...))."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
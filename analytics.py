@@ -1,22 +1,67 @@
 import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+import time
 
+import numpy as np
 
-def summarize_db(db_name="simulation_results.db"):
-    """Show average monthly profit and revenue for each model."""
+
+def summarize_db(db_name="simulation_results.db", interactive=None):
+    """
+    Show average monthly profit and revenue for each model.
+
+    interactive: True shows the chart in a window, False saves it as
+    summary_<timestamp>.png. None (default) decides by whether stdout is a terminal.
+    """
     conn = sqlite3.connect(db_name)
-    df = pd.read_sql("SELECT model, AVG(mean_profit) as avg_profit, AVG(mean_revenue) as avg_revenue FROM results GROUP BY model", conn)
+    rows = conn.execute(
+        "SELECT model, ROUND(AVG(mean_profit), 2) AS avg_profit, ROUND(AVG(mean_revenue), 2) AS avg_revenue "
+        "FROM results GROUP BY model"
+    ).fetchall()
     conn.close()
+    # SQLite stores NaN as NULL; map it back so those averages print and plot as nan
+    rows = [
+        (model, np.nan if avg_profit is None else avg_profit, np.nan if avg_revenue is None else avg_revenue)
+        for model, avg_profit, avg_revenue in rows
+    ]
 
     print("\n--- Historical Averages from Database ---")
-    print(df)
+    print(f"{'model':20s} | {'avg_profit':>12s} | {'avg_revenue':>12s}")
+    for model, avg_profit, avg_revenue in rows:
+        print(f"{model:20s} | {avg_profit:12.2f} | {avg_revenue:12.2f}")
     print("------------------------------------------\n")
 
-    # Optional: visualize the comparison
-    df.plot(kind="bar", x="model", y=["avg_profit", "avg_revenue"], figsize=(8, 5))
-    plt.title("Average Profit and Revenue per Model (Historical)")
-    plt.ylabel("Value")
-    plt.grid(True, axis="y", linestyle="--", alpha=0.7)
-    plt.tight_layout()
-    plt.show()
+    if not rows:
+        return
+
+    models, avg_profit, avg_revenue = (np.asarray(col) for col in zip(*rows))
+
+    if interactive is None:
+        interactive = sys.stdout.isatty()
+    if interactive:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=(14, 5))
+    else:
+        # Headless: draw on a private Agg canvas, leaving pyplot's backend alone
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(14, 5))
+        FigureCanvasAgg(fig)
+
+    # Optional: visualize the comparison (one figure, one show)
+    ax1, ax2 = fig.subplots(1, 2)
+    ax1.bar(models, avg_profit)
+    ax1.set_title("Average Profit per Model (Historical)")
+    ax2.bar(models, avg_revenue)
+    ax2.set_title("Average Revenue per Model (Historical)")
+    for ax in (ax1, ax2):
+        ax.set_ylabel("Value")
+        ax.grid(True, axis="y", linestyle="--", alpha=0.7)
+        ax.tick_params(axis="x", labelrotation=30)
+    fig.tight_layout()
+
+    if interactive:
+        plt.show()
+    else:
+        fig.savefig(f"summary_{int(time.time())}.png", dpi=100)
@@ -1,13 +1,28 @@
-import json
+import functools
 import os
 
+try:
+    import orjson as json  # C parser; optional
+except ImportError:
+    import json
+
+
+@functools.lru_cache(maxsize=None)
+def _load_json(path, mtime):
+    """Parse a config file once per (path, modification time)."""
+    # Raw bytes: no text decoding layer; both orjson and json accept bytes
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
 class Config:
     """Holds and validates all simulation parameters."""
 
     def __init__(self, config_path=None):
         if config_path and os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                self.params = json.load(f)
+            path = os.path.abspath(config_path)
+            # Copy so _apply_defaults never mutates the cached dict
+            self.params = dict(_load_json(path, os.path.getmtime(path)))
             print(f"✅ Loaded config: {config_path}")
         else:
             if config_path:
@@ -1,14 +1,39 @@
 import sqlite3
-import pandas as pd
+from itertools import repeat
 
-def save_to_db(results, db_name="simulation_results.db"):
-    conn = sqlite3.connect(db_name)
+import numpy as np
+
+# Same literal every call so sqlite3's per-connection statement cache reuses it
+INSERT_RESULT_SQL = "INSERT INTO results (model, month, mean_profit, mean_revenue) VALUES (?, ?, ?, ?)"
+
+
+def initialize_db(conn):
+    """Create the results table if needed and tune SQLite for batch writes."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS results ("
+        "month INTEGER, mean_profit REAL, mean_revenue REAL, model TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_model ON results(model)")
+
+
+def _result_rows(results):
+    """Yield one (model, month, mean_profit, mean_revenue) row at a time."""
     for model, stats in results.items():
-        df = pd.DataFrame({
-            "month": range(1, len(stats["mean_profit"]) + 1),
-            "mean_profit": stats["mean_profit"],
-            "mean_revenue": stats["mean_revenue"]
-        })
-        df["model"] = model
-        df.to_sql("results", conn, if_exists="append", index=False)
-    conn.close()
\ No newline at end of file
+        # One typed cast per column instead of float() per element
+        profits = np.asarray(stats["mean_profit"], dtype=np.float64).tolist()
+        revenues = np.asarray(stats["mean_revenue"], dtype=np.float64).tolist()
+        yield from zip(repeat(model), range(1, len(profits) + 1), profits, revenues)
+
+
+def save_to_db(results, db_name="simulation_results.db"):
+    # Autocommit mode: the only transaction is the explicit one below
+    conn = sqlite3.connect(db_name, isolation_level=None, cached_statements=256)
+    initialize_db(conn)
+
+    # One transaction (one fsync) for every model instead of one per model
+    conn.execute("BEGIN")
+    conn.executemany(INSERT_RESULT_SQL, _result_rows(results))
+    conn.execute("COMMIT")
+    conn.close()
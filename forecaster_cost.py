@@ -1,6 +1,11 @@
+import functools
 import math
+import numpy as np
+from statistics import NormalDist
 from typing import List, Dict, Any, Tuple
 
+from acceleration import njit, prange
+
 def poisson_pmf(k: int, lam: float) -> float:
     """Poisson probability P(N = k) for integer k >= 0 and rate lam > 0 (uses log-space for stability)."""
     if k < 0:
@@ -12,14 +17,97 @@ def poisson_pmf(k: int, lam: float) -> float:
     log_p = -lam + k * math.log(lam) - math.lgamma(k + 1)
     return math.exp(log_p)
 
+def _pmf_iter(lam: float, k_range: range):
+    """Yield P(N = k) for each k in k_range, computing log(lam) only once."""
+    if lam == 0:
+        for k in k_range:
+            yield 1.0 if k == 0 else 0.0
+        return
+
+    log_lam = math.log(lam)
+    for k in k_range:
+        yield math.exp(-lam + k * log_lam - math.lgamma(k + 1))
+
 def poisson_cdf(k: int, lam: float) -> float:
     """Poisson cumulative probability P(N <= k)."""
     if k < 0:
         return 0.0
-    total = 0.0
-    for i in range(0, k + 1):
-        total += poisson_pmf(i, lam)
-    return total
+    return sum(_pmf_iter(lam, range(0, k + 1)))
+
+@functools.lru_cache(maxsize=32)
+def _coverage_sigmas(coverage_prob: float) -> float:
+    """Normal-approximation z-score of coverage_prob, used to size the capacity search."""
+    p = min(max(coverage_prob, 1e-12), 1 - 1e-12)
+    return max(NormalDist().inv_cdf(p), 0.0)
+
+@njit(cache=True)
+def _poisson_capacity_and_pmf(lam, coverage_prob, k_sigma, k_min, k_max):
+    """
+    Single pass over the Poisson pmf using p(k+1) = p(k) * lam / (k+1).
+
+    Returns the smallest capacity C with P(N <= C) >= coverage_prob and an
+    array holding the pmf for k_min..k_max. For large rates the walk is seeded
+    in log-space ten sigmas below lambda, so exp(-lam) cannot underflow; the
+    mass skipped below the seed is far under float precision. A coverage_prob
+    already met at the seed (e.g. 0) is resolved by a log-space scan from 0.
+
+    The search window starts at lam + k_sigma * sqrt(lam) (+ slack) and its
+    span doubles whenever coverage is not reached yet. It gives up once the
+    remaining tail is below float precision (coverage unreachable) or at the
+    lam * 10 + 1000 hard cap, returning one past the last k inspected.
+    """
+    bound = int(lam + k_sigma * math.sqrt(lam)) + 8
+    hard_cap = int(lam * 10 + 1000) if lam > 0 else 1000
+
+    if lam > 100:
+        k = int(lam - 10 * math.sqrt(lam))
+        p = math.exp(-lam + k * math.log(lam) - math.lgamma(k + 1))
+    else:
+        k = 0
+        p = math.exp(-lam)
+
+    pmf = np.zeros(max(k_max - k_min + 1, 0))
+    cdf = p
+    capacity = -1
+    if k > 0 and cdf >= coverage_prob:
+        # The answer lies below the seed; exp(-lam) may underflow there, so
+        # accumulate each term from its log pmf rather than the recurrence
+        log_lam = math.log(lam)
+        lower_cdf = 0.0
+        for j in range(k + 1):
+            lower_cdf += math.exp(-lam + j * log_lam - math.lgamma(j + 1))
+            if lower_cdf >= coverage_prob:
+                capacity = j
+                break
+        if capacity < 0:
+            capacity = k
+    while True:
+        if k_min <= k <= k_max:
+            pmf[k - k_min] = p
+        if capacity < 0:
+            if cdf >= coverage_prob:
+                capacity = k
+            elif k >= bound:
+                # Geometric tail bound: sum_{j>k} p_j <= p * lam / (k + 1 - lam)
+                if k >= hard_cap or p * lam < 1e-16 * cdf * (k + 1 - lam):
+                    capacity = k + 1
+                else:
+                    bound = min(hard_cap, int(lam + 2 * (bound - lam)))
+        if capacity >= 0 and k >= k_max:
+            break
+        k += 1
+        p *= lam / k
+        cdf += p
+
+    return capacity, pmf
+
+@njit(parallel=True, cache=True)
+def _poisson_capacities(lam, coverage_prob, k_sigma):
+    """Coverage capacity for every rate in lam, one step per worker."""
+    capacities = np.empty(lam.shape[0], dtype=np.int64)
+    for t in prange(lam.shape[0]):
+        capacities[t] = _poisson_capacity_and_pmf(lam[t], coverage_prob, k_sigma, 0, -1)[0]
+    return capacities
 
 def forecast_server_load_one_step(
     forecasted_users: float,
@@ -45,29 +133,19 @@ def forecast_server_load_one_step(
 
     # Range around lambda for PMF inspection
     std = math.sqrt(lam) if lam > 0 else 0.0
-    k_min = max(0, int(math.floor(lam - 4 * std)))
-    k_max = max(0, int(math.floor(lam + 4 * std)))
-
-    pmf_table = []
-    for k in range(k_min, k_max + 1):
-        p = poisson_pmf(k, lam)
-        pmf_table.append((k, p))
+    # int() truncates toward zero; the max(0, ...) clamp makes it match floor()
+    k_min = max(0, int(lam - 4 * std))
+    k_max = max(0, int(lam + 4 * std))
 
     # Find capacity C such that P(N <= C) >= coverage_prob
-    C = 0
-    cdf_val = 0.0
-    upper_bound = int(lam * 10 + 1000) if lam > 0 else 1000
-    while C <= upper_bound:
-        cdf_val = poisson_cdf(C, lam)
-        if cdf_val >= coverage_prob:
-            break
-        C += 1
+    C, pmf = _poisson_capacity_and_pmf(lam, coverage_prob, _coverage_sigmas(coverage_prob), k_min, k_max)
+    pmf_table = list(zip(range(k_min, k_max + 1), pmf.tolist()))
 
     diagnostics = {
         "lambda": lam,
         "expected_load": lam,  # this is the expected usage for this time step
         "pmf_table": pmf_table,
-        "capacity_for_coverage": C,
+        "capacity_for_coverage": int(C),
         "coverage_probability": coverage_prob
     }
 
@@ -76,7 +154,8 @@ def forecast_server_load_one_step(
 def forecast_total_usage_over_horizon(
     forecasted_users_list: List[float],
     avg_requests_per_user: float,
-    coverage_prob: float = 0.99
+    coverage_prob: float = 0.99,
+    return_diagnostics: bool = False
 ) -> Tuple[float, Dict[str, Any]]:
     """
     Takes a list of forecasted user counts over multiple time steps, and:
@@ -84,31 +163,58 @@ def forecast_total_usage_over_horizon(
       - computes expected load per step
       - sums expected loads to get TOTAL USAGE (area under the curve).
 
+    By default the horizon is evaluated as arrays (lambda and capacity per
+    step). Pass return_diagnostics=True to also get the full per-step
+    results, including pmf tables.
+
     Returns:
       - total_expected_usage: scalar, can feed profit optimization
       - diagnostics: per-step details and configuration
     """
-    per_step_results = []
-    total_expected_usage = 0.0
-
-    for t, U_t in enumerate(forecasted_users_list):
-        expected_load, step_res = forecast_server_load_one_step(
-            forecasted_users=U_t,
-            avg_requests_per_user=avg_requests_per_user,
-            coverage_prob=coverage_prob
-        )
-        step_res["time_index"] = t  # optional: label the step
-        per_step_results.append(step_res)
-        total_expected_usage += expected_load
+    if return_diagnostics:
+        per_step_results = []
+        total_expected_usage = 0.0
+
+        for t, U_t in enumerate(forecasted_users_list):
+            expected_load, step_res = forecast_server_load_one_step(
+                forecasted_users=U_t,
+                avg_requests_per_user=avg_requests_per_user,
+                coverage_prob=coverage_prob
+            )
+            step_res["time_index"] = t  # optional: label the step
+            per_step_results.append(step_res)
+            total_expected_usage += expected_load
+
+        diagnostics = {
+            "per_step": per_step_results,
+            "coverage_probability": coverage_prob,
+            "avg_requests_per_user": avg_requests_per_user,
+        }
+
+        # Tuple so optimizers can use the scalar directly while retaining detail
+        return total_expected_usage, diagnostics
+
+    users = np.asarray(forecasted_users_list, dtype=np.float64)
+    r = float(avg_requests_per_user)
+
+    if np.any(users < 0):
+        raise ValueError("forecasted_users cannot be negative.")
+    if r < 0:
+        raise ValueError("avg_requests_per_user cannot be negative.")
+
+    lam = users * r  # Poisson rate per step
+    if not np.all(np.isfinite(lam)):
+        raise ValueError("forecasted_users and avg_requests_per_user must be finite.")
+    capacities = _poisson_capacities(lam, float(coverage_prob), _coverage_sigmas(coverage_prob))
 
     diagnostics = {
-        "per_step": per_step_results,
+        "lambda": lam,
+        "capacity_for_coverage": capacities,
         "coverage_probability": coverage_prob,
         "avg_requests_per_user": avg_requests_per_user,
     }
 
-    # Tuple so optimizers can use the scalar directly while retaining detail
-    return total_expected_usage, diagnostics
+    return float(lam.sum()), diagnostics
 
 # Example usage (connecting to your user forecast output):
 if __name__ == "__main__":
@@ -145,4 +251,27 @@ def compute_expected_cost(total_expected_requests, cost_per_request):
 
     return total_expected_requests * cost_per_request
 
+def compute_expected_cost_vec(total_requests_arr, cost_per_request_arr):
+    """
+    Vectorized compute_expected_cost for a whole horizon or price grid.
+
+    total_requests_arr : array-like
+        Expected number of requests per element.
+
+    cost_per_request_arr : array-like or float
+        Cost of serving a single request (broadcast against the requests).
+
+    Returns:
+        np.ndarray: expected cost per element.
+    """
+    total_requests_arr = np.asarray(total_requests_arr, dtype=np.float64)
+    cost_per_request_arr = np.asarray(cost_per_request_arr, dtype=np.float64)
+
+    if np.any(total_requests_arr < 0):
+        raise ValueError("total_expected_requests cannot be negative.")
+    if np.any(cost_per_request_arr < 0):
+        raise ValueError("cost_per_request cannot be negative.")
+
+    return total_requests_arr * cost_per_request_arr
+
    
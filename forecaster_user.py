@@ -13,14 +13,15 @@ def forecast_next_active_users(users):
         raise ValueError("Need at least 2 data points to compute changes.")
     
     # 1. Compute changes
-    deltas = users[1:] - users[:-1]   # Δ_t
+    deltas = np.diff(users)   # Δ_t
     
-    # Define up/down
+    # Define up/down as reductions (no boolean-indexed copies)
     up_mask = deltas > 0
     down_mask = deltas < 0
     
-    k = up_mask.sum()            # number of increases
-    n = (up_mask | down_mask).sum()  # number of non-zero changes
+    up_cnt = int(up_mask.sum())        # number of increases
+    down_cnt = int(down_mask.sum())    # number of decreases
+    n = up_cnt + down_cnt              # number of non-zero changes
     
     if n == 0:
         # All changes are zero → no info, just return last value
@@ -32,22 +33,13 @@ def forecast_next_active_users(users):
         return users[-1], diagnostics
     
     # 2. Estimate probability of increase (binomial MLE)
-    p_up = k / n
+    p_up = up_cnt / n
     
-    # 3. Magnitude of changes
-    up_changes = deltas[up_mask]
-    down_changes = deltas[down_mask]
-    
-    # Avoid empty arrays
-    if len(up_changes) == 0:
-        mu_up = 0.0
-    else:
-        mu_up = up_changes.mean()
-    
-    if len(down_changes) == 0:
-        mu_down = 0.0
-    else:
-        mu_down = down_changes.mean()
+    # 3. Magnitude of changes (0.0 when a direction never occurs)
+    up_sum = np.maximum(deltas, 0.0).sum()
+    down_sum = np.minimum(deltas, 0.0).sum()
+    mu_up = up_sum / up_cnt if up_cnt else 0.0
+    mu_down = down_sum / down_cnt if down_cnt else 0.0
     
     # Expected change using mixture of up/down scenarios
     expected_change = p_up * mu_up + (1 - p_up) * mu_down
@@ -102,13 +94,17 @@ class PriceElasticityModel:
         
         prices = prices[mask]
         users = users[mask]
+        if np.all(prices == prices[0]):
+            raise ValueError("Need at least 2 distinct prices to estimate elasticity.")
 
         logP = np.log(prices)
         logQ = np.log(users)
 
         # Simple linear regression: logQ = a + b*logP
-        # np.polyfit returns [b, a] when deg=1
-        b, a = np.polyfit(logP, logQ, 1)
+        # Closed-form OLS slope; avoids polyfit's Vandermonde + lstsq setup
+        dP = logP - logP.mean()
+        dQ = logQ - logQ.mean()
+        b = (dP * dQ).sum() / (dP * dP).sum()
         self.elasticity_ = b
 
         return self.elasticity_
@@ -153,6 +149,36 @@ class PriceElasticityModel:
             "user_loss": user_loss
         }
 
+    def predict_users_batch(self, current_price, new_prices, current_users):
+        """
+        predict_users for a whole grid of new prices in one NumPy expression.
+
+        new_prices: list/array of candidate prices P1
+
+        Returns: dict with predicted_users and user_loss arrays (one entry per
+        price) plus the scalar elasticity_used
+        """
+        if self.elasticity_ is None:
+            raise ValueError("Model not fitted yet. Call fit(prices, users) first.")
+
+        P0 = float(current_price)
+        P1 = np.asarray(new_prices, dtype=float)
+        Q0 = float(current_users)
+
+        if P0 <= 0 or np.any(P1 <= 0):
+            raise ValueError("Prices must be positive.")
+        if Q0 < 0:
+            raise ValueError("Current users cannot be negative.")
+
+        # Same linear elasticity response as predict_users, broadcast over P1
+        Q1 = Q0 * (1 + self.elasticity_ * (P1 - P0) / P0)
+
+        return {
+            "elasticity_used": self.elasticity_,
+            "predicted_users": Q1,
+            "user_loss": Q0 - Q1
+        }
+
 
 # Example usage:
 if __name__ == "__main__":
@@ -1,25 +1,55 @@
 import numpy as np
 
+
+def _generator(rng):
+    """
+    Use the caller's np.random.Generator, or else the legacy global stream,
+    so direct calls still follow np.random.seed (same poisson/uniform/normal API).
+    """
+    return rng if rng is not None else np.random
+
+
 class PricingModel:
     """Base class for all pricing models."""
-    def calculate_revenue(self, users, params):
+    def calculate_revenue(self, users, params, rng=None):
         raise NotImplementedError("Subclasses must implement this method.")
 
     def effective_price_per_user(self, params):
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def revenue_per_user(self, params):
+        """Fixed monthly revenue per user, for models whose revenue is users * constant."""
+        raise NotImplementedError(f"{type(self).__name__} revenue is not a fixed multiple of users.")
+
+    def revenue_trace(self, months, params, rng=None):
+        """Per-user revenue for each month of a simulation (revenue is linear in users)."""
+        try:
+            return np.full(months, float(self.revenue_per_user(params)))
+        except NotImplementedError:
+            pass
+
+        # Generic stochastic fallback: one draw per month, written in place
+        rng = _generator(rng)
+        trace = np.empty(months)
+        for month in range(months):
+            trace[month] = np.atleast_1d(self.calculate_revenue(1.0, params, rng))[0]
+        return trace
+
 
 class FlatMonthly(PricingModel):
-    def calculate_revenue(self, users, params):
+    def calculate_revenue(self, users, params, rng=None):
         price = params["monthly_price"]
         return users * price
 
     def effective_price_per_user(self, params):
         return params["monthly_price"]
 
+    def revenue_per_user(self, params):
+        return params["monthly_price"]
+
 
 class YearlySubscription(PricingModel):
-    def calculate_revenue(self, users, params):
+    def calculate_revenue(self, users, params, rng=None):
         monthly_price = params["monthly_price"]
         discount = params.get("yearly_discount", 0.85)
         return users * (monthly_price * 12 * discount) / 12
@@ -29,27 +59,39 @@ class YearlySubscription(PricingModel):
         discount = params.get("yearly_discount", 0.85)
         return monthly_price * discount
 
+    def revenue_per_user(self, params):
+        monthly_price = params["monthly_price"]
+        discount = params.get("yearly_discount", 0.85)
+        return monthly_price * 12 * discount / 12
+
 
 class UsageBased(PricingModel):
     """Users pay based on how much they use the service."""
-    def calculate_revenue(self, users, params):
+    def calculate_revenue(self, users, params, rng=None):
+        rng = _generator(rng)
         base_usage = params.get("avg_usage", 20)
         price_per_unit = params.get("price_per_unit", 0.5)
 
         # 🧠 Introduce bursty usage with Poisson-distributed spikes
-        spike_events = np.random.poisson(lam=1, size=1)  # expected ~1 spike per period
-        usage = base_usage + spike_events * np.random.uniform(5, 15)
+        spike_events = rng.poisson(lam=1, size=1)  # expected ~1 spike per period
+        usage = base_usage + spike_events * rng.uniform(5, 15)
 
-        usage_factor = np.random.normal(1, 0.1)
+        usage_factor = rng.normal(1, 0.1)
         total_usage = usage * usage_factor
 
         return users * total_usage * price_per_unit
 
-    def effective_price_per_user(self, params):
-        avg_usage = params.get("avg_usage", 20)
+    def revenue_trace(self, months, params, rng=None):
+        """Same usage process as calculate_revenue, drawn for all months in one batch."""
+        rng = _generator(rng)
+        base_usage = params.get("avg_usage", 20)
         price_per_unit = params.get("price_per_unit", 0.5)
-        return avg_usage * price_per_unit
 
+        spike_events = rng.poisson(lam=1, size=months)
+        spike_size = rng.uniform(5, 15, size=months)
+        usage_factor = rng.normal(1, 0.1, size=months)
+
+        return (base_usage + spike_events * spike_size) * usage_factor * price_per_unit
 
     def effective_price_per_user(self, params):
         avg_usage = params.get("avg_usage", 20)
@@ -60,9 +102,9 @@ class UsageBased(PricingModel):
 # ✅ Add your new class here
 class TieredPricing(PricingModel):
     """Pricing model with multiple usage tiers."""
-    def calculate_revenue(self, users, params):
+    def calculate_revenue(self, users, params, rng=None):
         # simulate user usage
-        avg_usage = np.random.normal(20, 5)
+        avg_usage = _generator(rng).normal(20, 5)
         # simple tier logic
         if avg_usage <= 10:
             rate = 0.5
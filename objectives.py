@@ -1,12 +1,36 @@
 import numpy as np
+from acceleration import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True)
+def _mean_growth_jit(revenues):
+    """(mean month-over-month growth, every revenue is zero) in one pass."""
+    total = 0.0
+    all_zero = revenues[0] == 0
+    for i in range(1, revenues.shape[0]):
+        prev = revenues[i - 1]
+        all_zero = all_zero and revenues[i] == 0
+        total += (revenues[i] - prev) / (prev + 1e-9)
+    return total / (revenues.shape[0] - 1), all_zero
+
+
+def _mean_growth_vectorized(revenues):
+    return np.mean(np.diff(revenues) / (revenues[:-1] + 1e-9)), bool(np.all(revenues == 0))
+
+
+_mean_growth = _mean_growth_jit if NUMBA_AVAILABLE else _mean_growth_vectorized
+
 
 def revenue_growth_curve(revenues):
     """Average revenue growth rate over time (normalized to 0–1)."""
-    revenues = np.array(revenues, dtype=float)  # ensure NumPy array
-    if len(revenues) < 2 or np.all(revenues == 0):
+    revenues = np.asarray(revenues, dtype=np.float64)  # no copy for float64 arrays
+    if len(revenues) < 2:
+        return 0
+    avg_growth, all_zero = _mean_growth(revenues)
+    if all_zero:
         return 0
-    growth_rates = np.diff(revenues) / (revenues[:-1] + 1e-9)
-    avg_growth = np.clip(np.mean(growth_rates), -1, 1)
+    # NaN (bad input) passes through the clamp, as with np.clip
+    avg_growth = min(max(avg_growth, -1.0), 1.0)
     return (avg_growth + 1) / 2  # normalize to 0–1 range
 
 
@@ -15,20 +39,29 @@ def customer_satisfaction(price, churn_rate, base_price=10):
     Estimate satisfaction based on churn and perceived price fairness.
     Higher churn or excessive pricing reduces satisfaction.
     """
-    base = max(0, 1 - churn_rate)  # churn inverse
-    price_penalty = max(0, (price / base_price) - 1) * 0.5
-    return np.clip(base - price_penalty, 0, 1)
+    base = max(0.0, 1.0 - churn_rate)  # churn inverse
+    price_penalty = max(0.0, (price / base_price) - 1.0) * 0.5
+    # Scalar clamp; np.clip's array dispatch dominates a function this small
+    return min(max(base - price_penalty, 0.0), 1.0)
 
 
 def fairness_metric(user_usages, user_prices):
     """
     Measures fairness: how consistent profit is across users.
     Uses coefficient of variation (std/mean) as inequality measure.
+
+    2D inputs are treated as one population per row and return one
+    fairness value per row.
     """
-    user_usages = np.array(user_usages)
-    user_prices = np.array(user_prices)
-    with np.errstate(divide="ignore", invalid="ignore"):
-        ratios = np.divide(user_prices, user_usages, out=np.zeros_like(user_prices), where=user_usages != 0)
-    inequality = np.std(ratios) / (np.mean(ratios) + 1e-9)
-    fairness = 1 - np.clip(inequality, 0, 1)
+    user_usages = np.asarray(user_usages, dtype=np.float64)
+    user_prices = np.asarray(user_prices, dtype=np.float64)
+
+    # Plain divide against a zero-free denominator; zero usage maps to ratio 0
+    nonzero = user_usages != 0
+    ratios = user_prices / np.where(nonzero, user_usages, 1.0)
+    if not nonzero.all():
+        ratios = np.where(nonzero, ratios, 0.0)
+
+    inequality = ratios.std(axis=-1) / (ratios.mean(axis=-1) + 1e-9)
+    fairness = 1 - np.clip(inequality, 0.0, 1.0)
     return fairness
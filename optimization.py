@@ -12,17 +12,19 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List, Literal, Tuple
 
+import numpy as np
+
 from forecaster_user import forecast_next_active_users, PriceElasticityModel
 from forecaster_cost import (
     forecast_total_usage_over_horizon,
-    compute_expected_cost,
+    compute_expected_cost_vec,
 )
 
 
 Objective = Literal["user_growth", "profit", "hybrid"]
 
 
-@dataclass
+@dataclass(slots=True)
 class PriceOptionResult:
     price: float
     predicted_users: float
@@ -38,21 +40,23 @@ class PriceOptionResult:
 def _combine_trend_and_price_effect(
     trend_next_users: float,
     current_users: float,
-    elasticity_predicted_users: float,
-) -> float:
+    elasticity_predicted_users: np.ndarray,
+) -> np.ndarray:
     """
     Scale the trend forecast by the elasticity implied user ratio.
     Keeps the trend signal while incorporating price sensitivity.
+
+    elasticity_predicted_users holds one prediction per price.
     """
     if current_users <= 0:
-        return max(trend_next_users, 0.0)
-
-    ratio = elasticity_predicted_users / current_users
-    return max(trend_next_users * ratio, 0.0)
+        ratio = np.ones_like(elasticity_predicted_users, dtype=float)
+    else:
+        ratio = np.divide(elasticity_predicted_users, current_users)
+    return np.maximum(trend_next_users * ratio, 0.0)
 
 
-def evaluate_price_option(
-    new_price: float,
+def _evaluate_price_grid(
+    price_grid: List[float],
     *,
     current_price: float,
     historical_users: List[float],
@@ -60,61 +64,104 @@ def evaluate_price_option(
     avg_requests_per_user: float,
     cost_per_request: float,
     coverage_prob: float = 0.99,
-) -> PriceOptionResult:
+) -> Tuple[List[PriceOptionResult], np.ndarray, np.ndarray]:
     """
-    Evaluate a single price point and return detailed metrics.
+    Evaluate every price of the grid at once.
+
+    Returns one PriceOptionResult per price (score 0.0) plus the predicted
+    users and profit arrays that optimize_price scores.
     """
     if len(historical_users) < 1:
         raise ValueError("historical_users must contain at least one value.")
 
     current_users = historical_users[-1]
 
+    # The trend forecast is price-independent: compute it once for the grid
     trend_next_users, trend_diag = forecast_next_active_users(historical_users)
-    elasticity_res = elasticity_model.predict_users(
+    elasticity_batch = elasticity_model.predict_users_batch(
         current_price=current_price,
-        new_price=new_price,
+        new_prices=price_grid,
         current_users=current_users,
     )
 
     # Blend baseline trend with price-driven elasticity adjustment
+    prices = np.asarray(price_grid, dtype=float)
     predicted_users = _combine_trend_and_price_effect(
         trend_next_users=trend_next_users,
         current_users=current_users,
-        elasticity_predicted_users=elasticity_res["predicted_users"],
+        elasticity_predicted_users=elasticity_batch["predicted_users"],
     )
+    revenues = prices * predicted_users
 
-    user_growth = predicted_users - current_users
-    revenue = new_price * predicted_users
-
-    expected_usage, usage_diag = forecast_total_usage_over_horizon(
-        forecasted_users_list=[predicted_users],
+    # Each price is a one-step horizon, so the per-step lambdas of a single
+    # call over all prices are the per-price expected usages
+    _, usage_batch = forecast_total_usage_over_horizon(
+        forecasted_users_list=predicted_users,
         avg_requests_per_user=avg_requests_per_user,
         coverage_prob=coverage_prob,
     )
-    expected_cost = compute_expected_cost(
-        total_expected_requests=expected_usage,
+    expected_usages = usage_batch["lambda"]
+    expected_costs = compute_expected_cost_vec(expected_usages, cost_per_request)
+    profits = revenues - expected_costs
+
+    evaluated: List[PriceOptionResult] = []
+    for i, p in enumerate(price_grid):
+        # Plain floats and copies, so no option keeps the grid arrays alive
+        diagnostics = {
+            "trend": trend_diag,
+            "elasticity": {
+                "elasticity_used": float(elasticity_batch["elasticity_used"]),
+                "predicted_users": float(elasticity_batch["predicted_users"][i]),
+                "user_loss": float(elasticity_batch["user_loss"][i]),
+            },
+            "usage": {
+                "lambda": expected_usages[i:i + 1].copy(),
+                "capacity_for_coverage": usage_batch["capacity_for_coverage"][i:i + 1].copy(),
+                "coverage_probability": coverage_prob,
+                "avg_requests_per_user": avg_requests_per_user,
+            },
+        }
+        # Score is filled by optimize_price once objective is chosen
+        evaluated.append(
+            PriceOptionResult(
+                price=p,
+                predicted_users=float(predicted_users[i]),
+                user_growth=float(predicted_users[i] - current_users),
+                revenue=float(revenues[i]),
+                expected_usage=float(expected_usages[i]),
+                expected_cost=float(expected_costs[i]),
+                profit=float(profits[i]),
+                score=0.0,
+                diagnostics=diagnostics,
+            )
+        )
+
+    return evaluated, predicted_users, profits
+
+
+def evaluate_price_option(
+    new_price: float,
+    *,
+    current_price: float,
+    historical_users: List[float],
+    elasticity_model: PriceElasticityModel,
+    avg_requests_per_user: float,
+    cost_per_request: float,
+    coverage_prob: float = 0.99,
+) -> PriceOptionResult:
+    """
+    Evaluate a single price point and return detailed metrics.
+    """
+    evaluated, _, _ = _evaluate_price_grid(
+        [new_price],
+        current_price=current_price,
+        historical_users=historical_users,
+        elasticity_model=elasticity_model,
+        avg_requests_per_user=avg_requests_per_user,
         cost_per_request=cost_per_request,
+        coverage_prob=coverage_prob,
     )
-    profit = revenue - expected_cost
-
-    diagnostics = {
-        "trend": trend_diag,
-        "elasticity": elasticity_res,
-        "usage": usage_diag,
-    }
-
-    # Score is filled by optimize_price once objective is chosen
-    return PriceOptionResult(
-        price=new_price,
-        predicted_users=predicted_users,
-        user_growth=user_growth,
-        revenue=revenue,
-        expected_usage=expected_usage,
-        expected_cost=expected_cost,
-        profit=profit,
-        score=0.0,
-        diagnostics=diagnostics,
-    )
+    return evaluated[0]
 
 
 def optimize_price(
@@ -143,40 +190,35 @@ def optimize_price(
     if not 0 <= hybrid_weight_growth <= 1:
         raise ValueError("hybrid_weight_growth must be between 0 and 1.")
 
-    evaluated: List[PriceOptionResult] = []
-    for p in price_grid:
-        res = evaluate_price_option(
-            new_price=p,
-            current_price=current_price,
-            historical_users=historical_users,
-            elasticity_model=elasticity_model,
-            avg_requests_per_user=avg_requests_per_user,
-            cost_per_request=cost_per_request,
-            coverage_prob=coverage_prob,
-        )
-        evaluated.append(res)
-
-    max_users = max(r.predicted_users for r in evaluated) or 1.0
-    profits = [r.profit for r in evaluated]
-    max_profit = max(profits) if profits else 1.0
-    min_profit = min(profits) if profits else 0.0
-    profit_range = max(max_profit - min_profit, 1e-9)
-
-    def score_fn(res: PriceOptionResult) -> float:
-        if objective == "user_growth":
-            return res.predicted_users
-        if objective == "profit":
-            return res.profit
-        if objective == "hybrid":
-            growth_score = res.predicted_users / max_users
-            profit_score = (res.profit - min_profit) / profit_range
-            return hybrid_weight_growth * growth_score + (1 - hybrid_weight_growth) * profit_score
+    evaluated, predicted_users, profits = _evaluate_price_grid(
+        price_grid,
+        current_price=current_price,
+        historical_users=historical_users,
+        elasticity_model=elasticity_model,
+        avg_requests_per_user=avg_requests_per_user,
+        cost_per_request=cost_per_request,
+        coverage_prob=coverage_prob,
+    )
+
+    if objective == "user_growth":
+        scores = predicted_users
+    elif objective == "profit":
+        scores = profits
+    elif objective == "hybrid":
+        max_users = predicted_users.max() or 1.0
+        min_profit = profits.min()
+        profit_range = max(profits.max() - min_profit, 1e-9)
+        growth_score = predicted_users / max_users
+        profit_score = (profits - min_profit) / profit_range
+        scores = hybrid_weight_growth * growth_score + (1 - hybrid_weight_growth) * profit_score
+    else:
         raise ValueError(f"Unsupported objective '{objective}'.")
 
-    for res in evaluated:
-        res.score = score_fn(res)
+    for res, score in zip(evaluated, scores.tolist()):
+        res.score = score
 
-    best = max(evaluated, key=lambda r: r.score)
+    # argmax returns the first maximum, matching max(..., key=score)
+    best = evaluated[int(np.argmax(scores))]
     return best, evaluated
 
 
@@ -1,102 +1,269 @@
+from functools import lru_cache
+
 import numpy as np
+from acceleration import NUMBA_AVAILABLE, njit, prange
 from objectives import revenue_growth_curve, customer_satisfaction, fairness_metric
 
+
+# ---------- Numeric kernels (shared by Simulation and the JIT loop) ----------
+_DECAY_RATE = 0.04
+
+# exp(-decay * month) for months 1.._MAX_MONTHS, computed once at import;
+# longer horizons fall back to evaluating the exponential directly
+_MAX_MONTHS = 1024
+_DECAY_TABLE = np.exp(-_DECAY_RATE * np.arange(1, _MAX_MONTHS + 1))
+_DECAY_TABLE.flags.writeable = False
+
+
+@njit(cache=True)
+def _decayed_growth(month, base_growth):
+    return base_growth * np.exp(-_DECAY_RATE * month)
+
+
+@njit(cache=True)
+def _scaled_cost_ratio(users, base_cost_ratio):
+    scale_factor = np.log10(users + 10) / 4
+    improvement = 0.1 * scale_factor
+    return base_cost_ratio * (1 - improvement)
+
+
+@lru_cache(maxsize=32)
+def _growth_vector(months, base_growth):
+    """Decayed growth rate for months 1..months; read-only, shared by every Simulation."""
+    if months <= _MAX_MONTHS:
+        growth = base_growth * _DECAY_TABLE[:months]
+    else:
+        growth = np.asarray(_decayed_growth(np.arange(1, months + 1), base_growth), dtype=np.float64)
+    growth.flags.writeable = False
+    return growth
+
+
+def _simulate_months_vectorized(users, growth, churn, base_cost_ratio, revenue_per_user):
+    """
+    Whole-horizon NumPy version of the month recurrence, along the last axis.
+
+    revenue_per_user may be (months,) or (runs, months); the user trajectory
+    is deterministic, so it is computed once and broadcast across runs.
+    churn and revenue_per_user may also be (n, 1) columns, one per price
+    scenario, which gives (n, months) user trajectories.
+    """
+    # One buffer becomes the factors and then the user trajectory in place
+    user_counts = np.add(growth, 1 - churn)
+    np.maximum(user_counts, 0, out=user_counts)
+    np.cumprod(user_counts, axis=-1, out=user_counts)
+    user_counts *= users
+
+    # Cost efficiency depends on the user base at the start of each month
+    users_before = np.empty_like(user_counts)
+    users_before[..., 0] = users
+    users_before[..., 1:] = user_counts[..., :-1]
+    margin = _scaled_cost_ratio(users_before, base_cost_ratio)
+    np.subtract(1, margin, out=margin)
+
+    revenues = user_counts * revenue_per_user
+    profits = revenues * margin
+    return user_counts, revenues, profits
+
+
+@njit(cache=True, fastmath=True)
+def _simulate_months_jit(users, growth, churn, base_cost_ratio, revenue_per_user):
+    """Month-by-month recurrence compiled by Numba into preallocated outputs."""
+    months = revenue_per_user.shape[0]
+    user_counts = np.empty(months)
+    revenues = np.empty(months)
+    profits = np.empty(months)
+
+    for m in range(months):
+        cost_ratio = _scaled_cost_ratio(users, base_cost_ratio)
+        users = max(users * (1 + growth[m] - churn), 0.0)
+
+        user_counts[m] = users
+        revenues[m] = users * revenue_per_user[m]
+        profits[m] = revenues[m] * (1 - cost_ratio)
+
+    return user_counts, revenues, profits
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _simulate_runs_jit(users, growth, churn, base_cost_ratio, revenue_per_user):
+    """Run the compiled recurrence for every row of a (runs, months) grid in parallel."""
+    runs, months = revenue_per_user.shape
+    user_counts = np.empty((runs, months))
+    revenues = np.empty((runs, months))
+    profits = np.empty((runs, months))
+
+    for r in prange(runs):
+        user_counts[r], revenues[r], profits[r] = _simulate_months_jit(
+            users, growth, churn, base_cost_ratio, revenue_per_user[r]
+        )
+
+    return user_counts, revenues, profits
+
+
+# The compiled loop beats NumPy's temporaries; without Numba the loop would be
+# interpreted, so fall back to the vectorized form.
+_simulate_months = _simulate_months_jit if NUMBA_AVAILABLE else _simulate_months_vectorized
+_simulate_runs = _simulate_runs_jit if NUMBA_AVAILABLE else _simulate_months_vectorized
+
+
 class Simulation:
     """Runs a month-by-month simulation with dynamic feedback effects."""
 
     def __init__(self, config, model):
         self.cfg = config
         self.model = model
-        self.months = config.get("months")
+        # Plain dict reads: cheaper than get() and always in sync with all()
+        params = config.all()
+        self.months = params["months"]
+        # months and growth_rate are fixed for this instance, so the growth
+        # curve is built once (and shared by instances with the same inputs)
+        self.growth = _growth_vector(self.months, float(params["growth_rate"]))
+        # Fixed kernel inputs, converted to float64 once rather than on every run
+        self.initial_users = float(params["initial_users"])
+        self.base_cost_ratio = float(params["cost_ratio"])
 
     # ---------- Dynamic behavior models ----------
     def dynamic_churn(self, price, base_churn):
-        baseline_price = self.cfg.get("monthly_price")
+        baseline_price = self.cfg.params["monthly_price"]
         return base_churn + 0.01 * ((price / baseline_price) - 1) * 10
 
     def dynamic_growth(self, month, base_growth):
-        decay_rate = 0.04
-        return base_growth * np.exp(-decay_rate * month)
+        month = np.asarray(month)
+        # The table only covers whole months; fractional ones are evaluated directly
+        if np.issubdtype(month.dtype, np.integer) and np.all((month >= 1) & (month <= _MAX_MONTHS)):
+            return base_growth * _DECAY_TABLE[month - 1]
+        return _decayed_growth(month, base_growth)
 
     def dynamic_cost_ratio(self, users, base_cost_ratio):
-        scale_factor = np.log10(users + 10) / 4
-        improvement = 0.1 * scale_factor
-        return base_cost_ratio * (1 - improvement)
+        return _scaled_cost_ratio(users, base_cost_ratio)
 
-    # ---------- Single simulation run ----------
-    def run_once(self, seed=None):
-        if seed is not None:
-            np.random.seed(seed)
-
-        users = self.cfg.get("initial_users")
-        base_growth = self.cfg.get("growth_rate")
-        base_churn = self.cfg.get("churn_rate")
-        base_cost_ratio = self.cfg.get("cost_ratio")
-        price = self.model.effective_price_per_user(self.cfg.all())
-
-        profits = []
-        revenues = []
-        churn = base_churn
-
-        for month in range(1, self.months + 1):
-            growth = self.dynamic_growth(month, base_growth)
-            churn = self.dynamic_churn(price, base_churn)
-            cost_ratio = self.dynamic_cost_ratio(users, base_cost_ratio)
-
-            new_users = users * growth
-            lost_users = users * churn
-            users = max(users + new_users - lost_users, 0)
-
-            revenue = float(np.atleast_1d(self.model.calculate_revenue(users, self.cfg.all()))[0])
-            cost = revenue * cost_ratio
-            profit = revenue - cost
-
-            revenues.append(revenue)
-            profits.append(profit)
-
-        # --- Fairness Simulation ---
-        user_usages = np.random.lognormal(mean=2.5, sigma=0.6, size=100)
+    # ---------- Random inputs (drawn from the run's np.random.Generator) ----------
+    def _revenue_per_user(self, params, rng):
+        """Per-user revenue for each month; every model's revenue is linear in users."""
+        return self.model.revenue_trace(self.months, params, rng)
+
+    def _user_usages(self, rng):
+        return rng.lognormal(mean=2.5, sigma=0.6, size=100)
+
+    def _fairness(self, price, user_usages):
+        """Fairness of one (100,) usage sample, or one per row of a (runs, 100) batch."""
         if self.model.__class__.__name__ == "UsageBased":
-            user_prices = user_usages * (price / np.mean(user_usages))
+            # Prices proportional to usage give every user the same price/usage
+            # ratio, so inequality is zero and fairness is exactly 1
+            return 1.0 if user_usages.ndim == 1 else np.ones(user_usages.shape[0])
         elif self.model.__class__.__name__ == "YearlySubscription":
-            user_prices = np.full_like(user_usages, price)
+            user_price = price
         else:
-            user_prices = np.full_like(user_usages, price * 1.05)
+            user_price = price * 1.05
+        # Everyone pays the same price: pass the scalar and let it broadcast
+        return fairness_metric(user_usages, user_price)
+
+    # ---------- Single simulation run ----------
+    def run_once(self, seed=None, rng=None, compute_fairness=True):
+        """
+        One simulation; draws come from rng, or a Generator seeded with seed.
+
+        compute_fairness=False skips the fairness draw and reports None.
+        """
+        if rng is None:
+            rng = np.random.default_rng(seed)
+
+        params = self.cfg.all()
+        price = self.model.effective_price_per_user(params)
+        # Churn is price-driven and therefore constant across months
+        churn = self.dynamic_churn(price, params["churn_rate"])
+
+        _, revenues, profits = _simulate_months(
+            self.initial_users,
+            self.growth,
+            churn,
+            self.base_cost_ratio,
+            self._revenue_per_user(params, rng),
+        )
 
         metrics = {
-            "profits": np.array(profits),
-            "revenues": np.array(revenues),
+            "profits": profits,
+            "revenues": revenues,
             "revenue_growth": revenue_growth_curve(revenues),
             "satisfaction": customer_satisfaction(price, churn),
-            "fairness": fairness_metric(user_usages, user_prices),
+            "fairness": self._fairness(price, self._user_usages(rng)) if compute_fairness else None,
         }
         return metrics
 
     # ---------- Multi-run simulation ----------
     def multi_run(self, runs=100):
         """Run multiple simulations and aggregate metrics."""
-        all_profits = []
-        all_revenues = []
-        growths, satisfactions, fairnesses = [], [], []
+        params = self.cfg.all()
+        price = self.model.effective_price_per_user(params)
+        churn = self.dynamic_churn(price, params["churn_rate"])
 
+        # Draw each run's random inputs exactly as run_once(seed=i) would,
+        # then simulate the whole (runs, months) grid in one kernel call.
+        revenue_per_user = np.empty((runs, self.months))
+        user_usages = np.empty((runs, 100))
         for i in range(runs):
-            metrics = self.run_once(seed=i)
-            all_profits.append(metrics["profits"])
-            all_revenues.append(metrics["revenues"])
-            growths.append(metrics["revenue_growth"])
-            satisfactions.append(metrics["satisfaction"])
-            fairnesses.append(metrics["fairness"])
+            rng = np.random.default_rng(i)
+            revenue_per_user[i] = self._revenue_per_user(params, rng)
+            user_usages[i] = self._user_usages(rng)
+        # One fairness_metric call over the whole (runs, 100) batch
+        fairnesses = self._fairness(price, user_usages)
 
-        all_profits = np.array(all_profits)
-        all_revenues = np.array(all_revenues)
+        _, all_revenues, all_profits = _simulate_runs(
+            self.initial_users,
+            self.growth,
+            churn,
+            self.base_cost_ratio,
+            revenue_per_user,
+        )
+        growths = np.empty(runs)
+        for i in range(runs):
+            growths[i] = revenue_growth_curve(all_revenues[i])
 
         stats = {
             "mean_profit": all_profits.mean(axis=0),
             "std_profit": all_profits.std(axis=0),
             "mean_revenue": all_revenues.mean(axis=0),
-            "revenue_growth": np.mean(growths),
-            "satisfaction": np.mean(satisfactions),
-            "fairness": np.mean(fairnesses),
+            "revenue_growth": growths.mean(),
+            "satisfaction": customer_satisfaction(price, churn),  # identical for every run
+            "fairness": fairnesses.mean(),
         }
 
         return stats
+
+    # ---------- Price sweep ----------
+    def sweep_prices(self, price_values):
+        """
+        Simulate every candidate monthly price at once on a (n_prices, months) grid.
+
+        Each row reprices the model at one monthly_price while growth is
+        shared by all rows. Churn is measured against the config's own
+        monthly_price, the current price a change would move away from, so a
+        row is not the same as run_once on a config repriced to that price
+        (which would reset the baseline and with it the churn penalty). Only
+        models with a fixed revenue_per_user (e.g. FlatMonthly,
+        YearlySubscription) can be swept.
+        """
+        params = self.cfg.all()
+        prices = np.asarray(price_values, dtype=np.float64)
+        repriced = [{**params, "monthly_price": p} for p in prices.tolist()]
+        effective = np.array([self.model.effective_price_per_user(p) for p in repriced])
+        revenue_per_user = np.array([self.model.revenue_per_user(p) for p in repriced])
+
+        churn = self.dynamic_churn(effective, params["churn_rate"])
+        # One row per price: churn and revenue_per_user as (n_prices, 1) columns
+        user_counts, revenues, profits = _simulate_months_vectorized(
+            self.initial_users,
+            self.growth,
+            churn[:, None],
+            self.base_cost_ratio,
+            revenue_per_user[:, None],
+        )
+
+        return {
+            "prices": prices,
+            "users": user_counts,
+            "revenues": revenues,
+            "profits": profits,
+            "best_profit_price": prices[profits[:, -1].argmax()],
+            "best_users_price": prices[user_counts[:, -1].argmax()],
+        }
@@ -1,20 +1,374 @@
-import matplotlib.pyplot as plt
+import os
+import time
+from functools import lru_cache
+
 import numpy as np
+from acceleration import NUMBA_AVAILABLE, njit, prange
+
+# MODULE6_HEADLESS=1: batch export only, draw straight to Agg's pixel buffer;
+# plots without a save_path go to profits_<timestamp>.png instead of a window
+HEADLESS = os.environ.get("MODULE6_HEADLESS", "") not in ("", "0")
+
+# pyplot is imported on the first plot, so code that only imports this
+# module (or never plots) does not pay for Matplotlib's startup
+plt = None
+
+
+def _plt():
+    global plt
+    if plt is None:
+        import matplotlib
+        if HEADLESS:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    return plt
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _mean_std_jit(runs):
+    """Per-month mean and std of a (n_runs, months) array in one Welford pass."""
+    n_runs, months = runs.shape
+    mean = np.empty(months)
+    std = np.empty(months)
+    for m in prange(months):
+        mu = 0.0
+        m2 = 0.0
+        for r in range(n_runs):
+            value = runs[r, m]
+            delta = value - mu
+            mu += delta / (r + 1)
+            m2 += delta * (value - mu)
+        mean[m] = mu
+        std[m] = np.sqrt(m2 / n_runs)
+    return mean, std
+
+
+def _mean_std_vectorized(runs):
+    return runs.mean(axis=0), runs.std(axis=0)
+
+
+_mean_std = _mean_std_jit if NUMBA_AVAILABLE else _mean_std_vectorized
+
+
+@njit(cache=True)
+def _lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points of (x, y) that
+    keep the curve's visual shape. The first and last points are always kept.
+    """
+    n = y.shape[0]
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[n_out - 1] = n - 1
+    bucket = (n - 2) / (n_out - 2)
+
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex
+        start = int((i + 1) * bucket) + 1
+        end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(start, end):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= end - start
+        avg_y /= end - start
+
+        # Keep the point of this bucket spanning the largest triangle
+        best_area = -1.0
+        best = start
+        for j in range(int(i * bucket) + 1, start):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        keep[i + 1] = best
+        a = best
+    return keep
+
 
-def plot_results(results, months, deviations=None):
-    plt.figure(figsize=(10, 6))
+@lru_cache(maxsize=32)
+def _label_colors(labels):
+    """
+    {label: color} for a frozenset of labels, assigned from the default
+    color cycle in sorted label order, so a label keeps its color in every
+    plot of the same set regardless of dict order.
+    """
+    import matplotlib
+
+    cycle = matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]
+    return {label: cycle[i % len(cycle)] for i, label in enumerate(sorted(labels))}
+
+
+# Curves longer than this are downsampled with LTTB before drawing
+MAX_POINTS = 4096
+
+
+@lru_cache(maxsize=32)
+def _months_axis(months):
+    """Shared, read-only x values 1..months for every redraw of that length."""
     x = np.arange(1, months + 1)
+    x.flags.writeable = False
+    return x
+
+
+class ProfitPlotter:
+    """
+    Profit comparison figure that is built once and redrawn in place.
+
+    Every label's curve is one segment of a single LineCollection, so the
+    axes draw all curves in one call however many labels there are. The
+    first update creates the figure; later updates with the same labels
+    only swap the segments, skipping the Figure/Axes/legend construction.
+
+    offscreen=True draws on a private Figure + FigureCanvasAgg instead of a
+    pyplot figure, for batch PNG export without pyplot's figure manager.
+    """
+
+    def __init__(self, offscreen=False):
+        self.offscreen = offscreen
+        self.fig = None
+        self.ax = None
+        self.labels = []
+        self.colors = []
+        self.collection = None
+        self.bands = {}  # label column -> band PolyCollection
+        self._background = None
+
+    @staticmethod
+    def _segments(x, profits):
+        """(n_labels, points, 2) vertex array: one polyline per label.
+
+        x is either shared (points,) or per label (points, n_labels).
+        """
+        segments = np.empty((profits.shape[1], profits.shape[0], 2))
+        segments[:, :, 0] = x.T
+        segments[:, :, 1] = profits.T
+        return segments
+
+    def _new_figure(self):
+        if self.offscreen:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(fig)
+            return fig, fig.subplots()
+
+        plt = _plt()
+        if self.fig is not None:
+            plt.close(self.fig)
+        return plt.subplots(figsize=(10, 6))
+
+    def _is_stale(self):
+        if self.fig is None:
+            return True
+        # A pyplot figure goes away when the user closes its window
+        return not self.offscreen and not _plt().fignum_exists(self.fig.number)
+
+    def _build(self, segments, labels):
+        from matplotlib.collections import LineCollection
+        from matplotlib.lines import Line2D
+
+        self.fig, self.ax = self._new_figure()
+
+        colors = _label_colors(frozenset(labels))
+        self.labels = labels
+        self.colors = [colors[label] for label in labels]
+
+        # Rasterized so PDF/SVG exports embed pixels instead of per-segment paths
+        self.collection = LineCollection(segments, colors=self.colors, linewidths=2, rasterized=True)
+        self.ax.add_collection(self.collection)
+        self.ax.autoscale_view()
+        self.bands = {}
+
+        self.ax.set_title("Multiple Run Simulation: Profit Comparison (Mean ± Std)", fontsize=14)
+        self.ax.set_xlabel("Month")
+        self.ax.set_ylabel("Profit (relative units)")
+        # A collection has no per-curve legend entries, so use proxy handles
+        handles = [Line2D([], [], color=color, linewidth=2) for color in self.colors]
+        self.ax.legend(handles, labels)
+        self.ax.grid(True, linestyle="--", alpha=0.6)
+        self.fig.tight_layout()
+
+    def update(self, labels, profits, months, stds=None, max_points=MAX_POINTS):
+        """
+        labels: list of n_labels names; profits: (months, n_labels) array.
+        stds: optional (months, n_labels) band half-widths; all-NaN columns
+        get no band.
+        max_points: longer curves are LTTB-downsampled to this many points
+        (at least 3); None draws every point.
+        """
+        self._set_data(labels, profits, months, stds, max_points)
+        if not self.offscreen:
+            # Agg would render here and again on export, so only request
+            # a redraw for on-screen figures
+            self.fig.canvas.draw_idle()
+        return self.fig
+
+    def update_live(self, labels, profits, months, stds=None, max_points=MAX_POINTS):
+        """
+        update() for live monitoring loops: the curves and bands are blitted
+        over a cached background (axes, grid, legend), which is only
+        re-rendered when the labels or the axis limits change.
+        """
+        rebuilt = self._is_stale() or self.labels != list(labels)
+        limits = None if rebuilt else (self.ax.get_xlim(), self.ax.get_ylim())
+        self._set_data(labels, profits, months, stds, max_points)
+        if limits is not None:
+            # Keep the current view while the data still fits inside it, so
+            # the cached background stays valid; autoscaling stays enabled
+            (x0, x1), (y0, y1) = limits
+            data = self.ax.dataLim
+            if x0 <= data.x0 and data.x1 <= x1 and y0 <= data.y0 and data.y1 <= y1:
+                self.ax.set_xlim(x0, x1, auto=None)
+                self.ax.set_ylim(y0, y1, auto=None)
+
+        artists = [self.collection, *self.bands.values()]
+        for artist in artists:
+            artist.set_animated(True)  # left out of full draws, so not baked into the background
+
+        canvas = self.fig.canvas
+        if rebuilt:
+            _plt().show(block=False)
+        if rebuilt or self._background is None or limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            canvas.restore_region(self._background)
+
+        for artist in artists:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        return self.fig
+
+    def _set_data(self, labels, profits, months, stds, max_points):
+        from matplotlib.collections import PolyCollection
+
+        x = _months_axis(months)
+        labels = list(labels)
+        profits = np.asarray(profits, dtype=np.float64)
+        if stds is not None:
+            stds = np.asarray(stds, dtype=np.float64)
+
+        if max_points is not None and max_points < 3:
+            raise ValueError("max_points must be at least 3, or None to disable downsampling.")
+        if max_points is not None and months > max_points and profits.shape[1]:
+            # Each label keeps its own LTTB points; its band follows the same x
+            x_float = x.astype(np.float64)
+            keep = np.column_stack([
+                _lttb_indices(x_float, profits[:, i], max_points) for i in range(profits.shape[1])
+            ])
+            x = x[keep]
+            profits = np.take_along_axis(profits, keep, axis=0)
+            if stds is not None:
+                stds = np.take_along_axis(stds, keep, axis=0)
+        segments = self._segments(x, profits)
+
+        if self._is_stale() or self.labels != labels:
+            self._build(segments, labels)
+        else:
+            self.collection.set_segments(segments)
+            # relim() skips collections, so reset the data limits by hand
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim(segments.reshape(-1, 2))
+
+        with_band = [] if stds is None else np.flatnonzero(~np.isnan(stds).all(axis=0)).tolist()
+        for i in set(self.bands) - set(with_band):
+            self.bands.pop(i).remove()
+        for i in with_band:
+            verts = self._band_verts(x if x.ndim == 1 else x[:, i], profits[:, i], stds[:, i])
+            band = self.bands.get(i)
+            if band is None:
+                # Match the line's color so redraws don't advance the color cycle
+                self.bands[i] = band = PolyCollection(
+                    [verts], color=self.colors[i], alpha=0.2, rasterized=True,
+                )
+                self.ax.add_collection(band, autolim=False)
+            else:
+                # Reuse the band artist; only its polygon changes
+                band.set_verts([verts])
+            self.ax.update_datalim(verts)
+
+        self.ax.autoscale_view()
+
+    @staticmethod
+    def _band_verts(x, profits, std):
+        """Closed mean ± std polygon: forward along the upper edge, back along the lower."""
+        n = len(profits)
+        verts = np.empty((2 * n, 2))
+        verts[:n, 0] = x
+        np.add(profits, std, out=verts[:n, 1])
+        verts[n:, 0] = x[::-1]
+        np.subtract(profits[::-1], std[::-1], out=verts[n:, 1])
+        return verts
+
+
+_plotter = ProfitPlotter()
+_export_plotter = ProfitPlotter(offscreen=True)
+_live_plotter = ProfitPlotter()
+
+
+def plot_results_fast(labels, profits, months, stds=None, save_path=None, max_points=MAX_POINTS):
+    """
+    Array form of plot_results: profits (and optional stds) are already
+    stacked as (months, n_labels) columns in labels order.
+    """
+    if save_path is None and HEADLESS:
+        # No window to show, so export rather than draw a figure nobody sees
+        save_path = f"profits_{int(time.time())}.png"
+    if save_path is not None:
+        fig = _export_plotter.update(labels, profits, months, stds, max_points)
+        fig.canvas.print_png(save_path)
+        return
+
+    _plotter.update(labels, profits, months, stds, max_points)
+    _plt().show()
+
+
+def plot_results_live(labels, profits, months, stds=None, max_points=MAX_POINTS):
+    """
+    Non-blocking plot_results_fast for live loops (e.g. refreshing the
+    mean ± std as multi_run batches finish); each call only redraws the
+    curves and bands. Use with an interactive backend.
+    """
+    return _live_plotter.update_live(labels, profits, months, stds, max_points)
+
+
+def plot_results(results, months, deviations=None, raw_runs=None, save_path=None, max_points=MAX_POINTS):
+    """
+    Plot mean profit per label, with optional ±std bands.
+
+    raw_runs: optional {label: (n_runs, months) array}; when given, the mean
+    curves and std bands are computed from it instead of results/deviations.
+
+    save_path: write a PNG from a reused off-screen Agg canvas instead of
+    showing a window. Under MODULE6_HEADLESS it defaults to
+    profits_<timestamp>.png.
+
+    max_points: curves longer than this are downsampled (LTTB) before drawing;
+    must be at least 3. Pass None to draw every point.
+    """
+    if raw_runs is not None:
+        labels = list(raw_runs)
+        profits = np.empty((months, len(labels)))
+        stds = np.empty((months, len(labels)))
+        for i, label in enumerate(labels):
+            profits[:, i], stds[:, i] = _mean_std(np.asarray(raw_runs[label], dtype=np.float64))
+        return plot_results_fast(labels, profits, months, stds, save_path, max_points)
 
-    for label, profits in results.items():
-        plt.plot(x, profits, label=label, linewidth=2)
-        if deviations and label in deviations:
-            std = deviations[label]
-            plt.fill_between(x, profits - std, profits + std, alpha=0.2)
-
-    plt.title("Multiple Run Simulation: Profit Comparison (Mean ± Std)", fontsize=14)
-    plt.xlabel("Month")
-    plt.ylabel("Profit (relative units)")
-    plt.legend()
-    plt.grid(True, linestyle="--", alpha=0.6)
-    plt.tight_layout()
-    plt.show()
+    labels = list(results)
+    if labels:
+        profits = np.column_stack([results[label] for label in labels])
+    else:
+        profits = np.empty((months, 0))  # no labels: an empty chart, not an error
+    stds = None
+    if deviations:
+        # Labels without a deviation keep an all-NaN column: no band
+        stds = np.full(profits.shape, np.nan)
+        for i, label in enumerate(labels):
+            if label in deviations:
+                stds[:, i] = deviations[label]
+    return plot_results_fast(labels, profits, months, stds, save_path, max_points)